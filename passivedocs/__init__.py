@@ -2,6 +2,6 @@
 
 Expose useful symbols at package level.
 """
-from .diff import apply_diff
+from .diff import apply_diff, repair_diff
 
-__all__ = ["apply_diff"]
+__all__ = ["apply_diff", "repair_diff"]
@@ -1,12 +1,16 @@
 import json
 import logging
 import os
+import time
 from typing import Any, Dict, List, Optional
 
 import dotenv
 import ollama
 
-from .diff import apply_diff
+from .diff import apply_diff, repair_diff
+from .duplicates import replay_diffs
+from .routing import Router
+from .symbols import SymbolIndex
 
 
 logger = logging.getLogger(__name__)
@@ -17,12 +21,12 @@ TOOLS: List[Dict[str, Any]] = [
         "type": "function",
         "function": {
             "name": "diff",
-            "description": "Return a unified diff hunk for the current file by providing the hunk header and the hunk body separately. 'header' should contain the '@@ -old_start,old_count +new_start,new_count @@' line and 'diff' should contain the hunk body (context, removals, additions) without the header.",
+            "description": "Return unified diff hunks for the current file by providing the first hunk header and the hunk bodies separately. 'header' should contain the first '@@ -old_start,old_count +new_start,new_count @@' line and 'diff' should contain the first hunk body (context, removals, additions) without that header, optionally followed by further hunks, each starting with its own '@@' header line.",
             "parameters": {
                 "type": "object",
                 "properties": {
                     "header": {"type": "string", "description": "Unified diff hunk header, e.g. '@@ -42,3 +42,5 @@'"},
-                    "diff": {"type": "string", "description": "Hunk body: context, additions, deletions (without the header)"},
+                    "diff": {"type": "string", "description": "Hunk body: context, additions, deletions (without the first header). Further hunks may follow, each introduced by its own '@@ ... @@' line."},
                 },
                 "required": ["header", "diff"],
             },
@@ -40,6 +44,18 @@ TOOLS: List[Dict[str, Any]] = [
             },
         },
     },
+    {
+        "type": "function",
+        "function": {
+            "name": "lookup",
+            "description": "Return the definition of a symbol (function, class, method, type) from anywhere in the repository",
+            "parameters": {
+                "type": "object",
+                "properties": {"symbol": {"type": "string", "description": "Symbol name, e.g. 'parse_diff' or 'DocAgent.iterate'"}},
+                "required": ["symbol"],
+            },
+        },
+    },
     {
         "type": "function",
         "function": {
@@ -63,14 +79,58 @@ class DocAgent:
         files: List[str],
         client: Optional[ollama.Client] = None,
         process_all: bool = False,
+        router: Optional[Router] = None,
+        duplicates: Optional[Dict[str, List[str]]] = None,
+        index: Optional[SymbolIndex] = None,
+        repo_files: Optional[List[str]] = None,
     ) -> None:
         dotenv.load_dotenv()
         self.client = client or ollama.Client(host=os.environ.get("ENDPOINT"))
         self.files = files
+        # all target files, listed in the prompt; defaults to the files iterated
+        self.repo_files = repo_files if repo_files is not None else files
         self.readme = readme
         self.process_all = process_all
+        self.router = router or Router()
+        # representative file -> byte-identical copies that reuse its accepted diffs
+        self.duplicates = duplicates or {}
+        # diffs applied to each file during this run, in order
+        self.accepted_diffs: Dict[str, List[str]] = {}
+        self.conversations_saved = 0
+        self.index = index if index is not None else SymbolIndex.build(files)
+        # one client per endpoint; the default endpoint reuses self.client
+        self._clients: Dict[Optional[str], ollama.Client] = {os.environ.get("ENDPOINT"): self.client}
+        # per-model throughput counters: files, bytes, chat calls, seconds
+        self.model_stats: Dict[str, Dict[str, float]] = {}
         self.system_prompt = self._build_system_prompt()
 
+    # --- model routing --------------------------------------------------------------------
+    def _client_for(self, endpoint: Optional[str]) -> ollama.Client:
+        if endpoint not in self._clients:
+            self._clients[endpoint] = ollama.Client(host=endpoint)
+        return self._clients[endpoint]
+
+    def _record_stats(self, model: Optional[str], size: int, calls: int, elapsed: float) -> None:
+        stats = self.model_stats.setdefault(model or "<unset>", {"files": 0, "bytes": 0, "calls": 0, "seconds": 0.0})
+        stats["files"] += 1
+        stats["bytes"] += size
+        stats["calls"] += calls
+        stats["seconds"] += elapsed
+
+    def report_throughput(self) -> None:
+        """Log files, chat calls and throughput per model for this run."""
+        for model, stats in sorted(self.model_stats.items()):
+            seconds = stats["seconds"] or 1e-9
+            logger.info(
+                "Model %s: %d files, %d chat calls, %.1fs total, %.2f files/min, %.0f bytes/s",
+                model,
+                stats["files"],
+                stats["calls"],
+                stats["seconds"],
+                stats["files"] * 60 / seconds,
+                stats["bytes"] / seconds,
+            )
+
     # --- file I/O helpers -----------------------------------------------------------------
     def _read_file(self, path: str) -> str:
         with open(path, "r", encoding="utf-8") as f:
@@ -87,6 +147,9 @@ class DocAgent:
         original = self._read_file(path)
         updated = apply_diff(original, diff)
         self._write_file(path, updated)
+        self.accepted_diffs.setdefault(path, []).append(diff)
+        # keep line ranges used by lookup() in sync with the edited file
+        self.index.update(path)
         logger.info(
             "Updated file %s (%d -> %d bytes)",
             path,
@@ -94,26 +157,50 @@ class DocAgent:
             len(updated.encode("utf-8")),
         )
 
+    def _replay_onto_copies(self, file: str) -> int:
+        """Apply the diffs accepted for ``file`` to each of its byte-identical copies.
+
+        Each copy is patched in memory and written once, so a failed replay
+        leaves it untouched. Returns the number of copies replayed successfully.
+        """
+        diffs = list(self.accepted_diffs.get(file, []))
+        replayed = 0
+        for copy in self.duplicates.get(file, []):
+            logger.info("Replaying %d diffs from %s onto duplicate %s", len(diffs), file, copy)
+            try:
+                updated = replay_diffs(self._read_file(copy), diffs)
+            except ValueError as e:
+                logger.error("Could not replay diffs onto duplicate %s; left unchanged: %s", copy, e)
+                continue
+            if diffs:
+                self._write_file(copy, updated)
+                self.accepted_diffs[copy] = list(diffs)
+                self.index.update(copy)
+            replayed += 1
+        return replayed
+
     # --- prompt/messages builders -----------------------------------------------------------
     def _build_system_prompt(self) -> str:
-        files_list = "\n".join(self.files)
+        files_list = "\n".join(self.repo_files)
         prompt = (
             "You are a documentation assistant. Add documentation comments to code and update README/docs without changing program behavior. You will receive one file at a time with line numbers for reference only. Always respond with exactly one tool call.\n\n"
             "Repository files:\n"
             "{files}\n\n"
             "Repository readme:\n"
             "{readme}\n\n"
-            "You must only respond using the provided tools and follow the unified diff format rules below. If you cannot produce documentation based on current context, use `view(path=...)` to request more context, or call `next()` to skip the file.\n\n"
+            "You must only respond using the provided tools and follow the unified diff format rules below. If you cannot produce documentation based on current context, use `lookup(symbol=...)` to see a definition or `view(path=...)` to request a whole file, or call `next()` to skip the file.\n\n"
             "TOOLS:\n"
+            "  - `lookup(symbol: str)` - Request just the definition of a function, class or method defined elsewhere. Prefer this over `view`\n"
             "  - `view(path: str)` - Request content of another file for context\n"
-            "  - `diff(header: str, diff: str)` - Apply changes via a single unified diff hunk\n"
-            "  - header must be EXACTLY the hunk header, e.g. '@@ -42,3 +42,5 @@' (no surrounding text)\n"
-            "  - diff must contain only the hunk body (no header). Every body line MUST begin with one of: space (' '), '-' or '+'\n"
+            "  - `diff(header: str, diff: str)` - Apply changes via one or more unified diff hunks\n"
+            "  - header must be EXACTLY the first hunk header, e.g. '@@ -42,3 +42,5 @@' (no surrounding text)\n"
+            "  - diff must contain the first hunk body (without its header), optionally followed by more hunks, each starting with its own '@@ -a,b +c,d @@' line. Every body line MUST begin with one of: space (' '), '-' or '+'\n"
             "  - `next()` - No changes needed for current file\n\n"
             "DIFF RULES (STRICT):\n"
             "- Every line in the hunk body must start with a single prefix character: ' ' (context), '-' (deletion), or '+' (addition).\n"
             "- Empty original lines are represented by a '-' line with no following space (i.e. '-' then newline), not '- '.\n"
             "- The header counts MUST MATCH the body: old_count = number of lines in the body that start with ' ' or '-', new_count = number of lines that start with ' ' or '+'.\n"
+            "- A hunk that only adds lines uses old_count 0: '@@ -a,0 +c,d @@' inserts the lines AFTER line a of the file, so c = a + 1 (plus the net lines added by earlier hunks). Use '@@ -0,0 +1,d @@' to insert at the top of the file. Prefer including at least one context line instead.\n"
             "- Include 0-3 context lines (prefixed with a space) around edits to ensure deterministic matching. Context lines must match the file EXACTLY, including leading/trailing whitespace and newlines.\n"
             "- Added lines ('+') should include the exact characters you want inserted and should end with a newline in the real file.\n"
             "- If the file ends without a trailing newline, use a literal line '\\ No newline at end of file' on its own line in the body where appropriate.\n"
@@ -132,10 +219,10 @@ class DocAgent:
             "+cargo build\n"
             "+```\n\n"
             "WORKFLOW:\n"
-            "- Present only one small hunk per `diff()` call. Keep changes minimal.\n"
+            "- Put ALL hunks for the current file in a single `diff()` call, in file order. Line numbers in every header refer to the file content as last shown to you. Keep changes minimal.\n"
             "- If you produce a `diff()` tool call, ensure the header and body are consistent and that every body line uses the correct prefix.\n"
             "- If you are unable to produce a valid hunk, call `view()` or `next()`.\n\n"
-            "Be strict: malformed hunks (wrong prefixes, mismatched counts, or stray text) will be rejected."
+            "Be strict: mismatched header counts are corrected automatically, but malformed hunks (wrong prefixes, context that does not match the file, overlapping hunks, or stray text) will be rejected with an error explaining what to fix; nothing is applied from a rejected call."
         )
         return prompt.format(files=files_list, readme=self.readme)
 
@@ -149,11 +236,16 @@ class DocAgent:
             numbered_lines.append(f"{idx}: {ln}")
         numbered_content = "".join(numbered_lines)
 
-        return [
+        messages = [
             ollama.Message(role="system", content=self.system_prompt),
             ollama.Message(role="user", content=f"Document {path}. The following is the content (lines are prefixed with their line numbers for reference):"),
             ollama.Message(role="user", content=numbered_content),
         ]
+        # Signatures of what this file uses from elsewhere, so the model rarely needs view()
+        signatures = self.index.signatures_for(path, content)
+        if signatures:
+            messages.append(ollama.Message(role="user", content=f"Signatures of symbols used by {path} and defined elsewhere in the repository (path:line: declaration):\n{signatures}"))
+        return messages
 
     # --- tool call processing --------------------------------------------------------------
     def _process_tool_call(self, 
@@ -175,19 +267,35 @@ class DocAgent:
 
         if function_name == "diff":
             # Combine the provided header and diff body into a single unified diff string
-            header = args.get("header").strip()
-            body = args.get("diff").lstrip('\n')
+            header = args.get("header")
+            body = args.get("diff")
             if header is None or body is None:
                 logger.error("Diff tool call missing 'header' or 'diff' fields: %s", args)
                 messages.append(agent_message)
                 messages.append(ollama.Message(role="tool", content="Error: 'header' and 'diff' are required for diff tool.", tool_name="diff"))
                 return False
-            full_diff = f"{header}\n{body}"
-            self._handle_file_update(file, full_diff)
-            logger.info("Applied diff tool call for %s", file)
+            header = header.strip()
+            body = body.lstrip('\n')
+            # tolerate the first header being repeated at the top of the body
+            full_diff = body if body.startswith(header) else f"{header}\n{body}"
             messages.append(agent_message)
+            try:
+                full_diff, notes = repair_diff(full_diff)
+                self._handle_file_update(file, full_diff)
+            except ValueError as e:
+                logger.warning("Rejected diff for %s: %s", file, e)
+                messages.append(
+                    ollama.Message(role="tool", content=f"Error: diff rejected, {file} is unchanged. {e} Fix the problem and resend all hunks in one diff() call.", tool_name="diff")
+                )
+                return False
+            for note in notes:
+                logger.info("Repaired diff for %s: %s", file, note)
+            logger.info("Applied diff tool call for %s", file)
+            applied = f"Applied diff to {file}."
+            if notes:
+                applied += " Corrections made: " + " ".join(notes)
             messages.append(
-                ollama.Message(role="tool", content=f"Applied diff to {file}.", tool_name="diff")
+                ollama.Message(role="tool", content=applied, tool_name="diff")
             )
             updated = self._read_file(file)
             # add line nums
@@ -210,6 +318,20 @@ class DocAgent:
             messages.append(ollama.Message(role="tool", content=other, tool_name="view"))
             return False
 
+        if function_name == "lookup":
+            messages.append(agent_message)
+            symbol = (args.get("symbol") or "").strip()
+            logger.info("Looking up symbol %s", symbol)
+            try:
+                found = self.index.lookup(symbol)
+            except OSError as e:
+                logger.error("Error reading definition of %s: %s", symbol, e)
+                found = None
+            if found is None:
+                found = f"No definition of '{symbol}' found in the repository index. Try view(path=...), or move on."
+            messages.append(ollama.Message(role="tool", content=found, tool_name="lookup"))
+            return False
+
         if function_name == "next":
             return True
 
@@ -223,17 +345,36 @@ class DocAgent:
 
         To process all files, instantiate DocAgent(..., process_all=True).
         """
+        copies = {copy for group in self.duplicates.values() for copy in group}
         for file in self.files:
+            if file in copies:
+                continue
             logger.info("Processing file: %s", file)
             self._handle_single_file(file)
+            if file in self.duplicates:
+                self.conversations_saved += self._replay_onto_copies(file)
+        self.report_throughput()
+        logger.info("Skipped %d model conversations for duplicate files", self.conversations_saved)
 
     def _handle_single_file(self, file: str) -> None:
+        size = os.path.getsize(file)
+        model, endpoint = self.router.route(file, size)
+        client = self._client_for(endpoint)
+        logger.info("Routing %s to model %s at %s", file, model, endpoint)
+        start = time.monotonic()
+        calls = self._converse(file, client, model)
+        self._record_stats(model, size, calls, time.monotonic() - start)
+
+    def _converse(self, file: str, client: ollama.Client, model: Optional[str]) -> int:
+        """Run the tool-call conversation for one file. Returns the number of chat calls made."""
         messages = self._build_initial_messages(file)
+        calls = 0
         done = False
         while not done:
+            calls += 1
             try:
-                response: ollama.ChatResponse = self.client.chat(
-                    model=os.environ.get("MODEL"), messages=messages, tools=TOOLS, stream=False,
+                response: ollama.ChatResponse = client.chat(
+                    model=model, messages=messages, tools=TOOLS, stream=False,
                     keep_alive="20m"
                 )
             except Exception as e:
@@ -254,3 +395,4 @@ class DocAgent:
                 if should_end:
                     done = True
                     break
+        return calls
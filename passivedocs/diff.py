@@ -1,3 +1,6 @@
+import re
+
+
 def parse_diff(original_text, unified_diff):
     r"""Apply a unified diff to original_text and return the patched text.
 
@@ -65,9 +68,15 @@ def parse_diff(original_text, unified_diff):
                 a_len = 1
         except Exception:
             raise ValueError('Invalid unified diff hunk header.')
+        try:
+            new_start = int(parts[2].lstrip('+').split(',', 1)[0])
+        except ValueError:
+            new_start = None
 
-        # Fill in untouched lines up to the hunk's start (a_start is 1-based)
+        # Fill in untouched lines up to the hunk's start (a_start is 1-based).
         target_index = a_start - 1
+        if a_len == 0:
+            target_index = _insertion_index(a_start, new_start, len(out_lines) - src_index)
         if src_index > target_index:
             # overlapping hunks or invalid positions
             raise ValueError('Hunk overlaps previous hunk or is out of order.')
@@ -99,14 +108,14 @@ def parse_diff(original_text, unified_diff):
             if sign == ' ':
                 # context: must match original
                 if src_index >= len(original_lines) or original_lines[src_index] != content:
-                    raise ValueError('Context line mismatch when applying hunk.')
+                    raise ValueError(_mismatch('Context', src_index, original_lines, content))
                 out_lines.append(content)
                 src_index += 1
                 last_sign = ' '
             elif sign == '-':
                 # deletion: original must match, but do not append
                 if src_index >= len(original_lines) or original_lines[src_index] != content:
-                    raise ValueError('Deletion line mismatch when applying hunk.')
+                    raise ValueError(_mismatch('Deletion', src_index, original_lines, content))
                 src_index += 1
                 last_sign = '-'
             elif sign == '+':
@@ -146,6 +155,155 @@ def parse_diff(original_text, unified_diff):
     return new_text
 
 
+def _insertion_index(old_start, new_start, offset):
+    """0-based index where a pure insertion hunk ('-a,0 +c,d') goes.
+
+    By the unified diff convention the lines go after line a ('-0,0' is the
+    top of the file), and then c == a + offset + 1. When c instead equals
+    a + offset, the header says the new lines take line a's place, i.e. they
+    go before line a; that reading is honoured rather than silently moving the
+    insertion down a line.
+    """
+    if old_start >= 1 and new_start == old_start + offset:
+        return old_start - 1
+    return old_start
+
+
+def _mismatch(kind, src_index, original_lines, content):
+    """Describe a context/deletion line that does not match the original file."""
+    if src_index >= len(original_lines):
+        found = 'end of file'
+    else:
+        found = repr(original_lines[src_index])
+    return (
+        f'{kind} line mismatch when applying hunk: line {src_index + 1} is {found}, '
+        f'diff expects {content!r}.'
+    )
+
+
+_HUNK_HEADER = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@(.*)$')
+_NO_NEWLINE = '\\ No newline at end of file'
+
+
+def repair_diff(unified_diff):
+    r"""Validate the hunks of a unified diff and fix simple header mistakes.
+
+    Each hunk's ``-a,b +c,d`` counts are recomputed from its body and
+    rewritten when they disagree, ``+c`` is recomputed from the preceding
+    hunks, hunks are sorted by their original start line, and bare empty body
+    lines inside a hunk are treated as empty context lines. File headers (``---``/``+++``)
+    are dropped.
+
+    Returns ``(repaired_diff, notes)`` where ``notes`` lists every correction
+    made. Raises ValueError naming the hunk and line for problems that cannot
+    be repaired (bad header, bad line prefix, empty or overlapping hunks).
+    """
+    notes = []
+    hunks = []
+    current = None
+    blanks = 0  # bare empty lines seen since the last body line
+    for line in unified_diff.splitlines():
+        if line.startswith('@@'):
+            blanks = 0
+            match = _HUNK_HEADER.match(line)
+            if not match:
+                raise ValueError(
+                    f'Hunk {len(hunks) + 1}: invalid header {line!r}; '
+                    "expected '@@ -start,count +start,count @@'."
+                )
+            current = {
+                'number': len(hunks) + 1,
+                'header': line,
+                'old_start': int(match.group(1)),
+                # counts omitted from the header default to 1
+                'stated': (
+                    int(match.group(2) or 1),
+                    int(match.group(3)),
+                    int(match.group(4) or 1),
+                ),
+                'old_count': 0,
+                'new_count': 0,
+                'trailer': match.group(5),
+                'body': [],
+            }
+            hunks.append(current)
+            continue
+        if current is None:
+            # file headers or stray text before the first hunk
+            continue
+        number, body = current['number'], current['body']
+        if line == _NO_NEWLINE:
+            body.append(line)
+            continue
+        if not line:
+            # only an empty context line if more body follows; blank lines
+            # separating hunks or trailing the diff are dropped
+            blanks += 1
+            continue
+        for _ in range(blanks):
+            notes.append(f'Hunk {number}: treated empty body line {len(body) + 1} as an empty context line.')
+            body.append(' ')
+            current['old_count'] += 1
+            current['new_count'] += 1
+        blanks = 0
+        sign = line[0]
+        if sign not in ' -+':
+            raise ValueError(
+                f'Hunk {number}: body line {len(body) + 1} {line!r} must start with '
+                "' ' (context), '-' (deletion) or '+' (addition)."
+            )
+        if sign != '+':
+            current['old_count'] += 1
+        if sign != '-':
+            current['new_count'] += 1
+        body.append(line)
+
+    if not hunks:
+        raise ValueError("No hunk header found; each hunk must start with '@@ -start,count +start,count @@'.")
+    for hunk in hunks:
+        if hunk['old_count'] == 0 and hunk['new_count'] == 0:
+            raise ValueError(f"Hunk {hunk['number']} ({hunk['header']}) has no body lines.")
+        if hunk['old_count'] == 0 and hunk['stated'][0] != 0:
+            # '-a,b' with b > 0 but no context: unclear whether to insert before
+            # or after line a, so do not guess
+            raise ValueError(
+                f"Hunk {hunk['number']} ({hunk['header']}) only adds lines; include at least "
+                "one context line so the insertion point is unambiguous, or use '-a,0' to insert after line a."
+            )
+        # 0-based index of the first original line the hunk touches; a pure
+        # insertion ('-a,0') goes after line a
+        hunk['index'] = hunk['old_start'] if hunk['old_count'] == 0 else hunk['old_start'] - 1
+
+    starts = [h['index'] for h in hunks]
+    if starts != sorted(starts):
+        notes.append('Reordered hunks by original start line.')
+        hunks.sort(key=lambda h: h['index'])
+
+    out = []
+    offset = 0
+    previous = None
+    for hunk in hunks:
+        old_start, old_count, new_count = hunk['old_start'], hunk['old_count'], hunk['new_count']
+        if old_count == 0:
+            hunk['index'] = _insertion_index(old_start, hunk['stated'][1], offset)
+        if previous is not None and previous['index'] + previous['old_count'] > hunk['index']:
+            raise ValueError(
+                f"Hunk {hunk['number']} ({hunk['header']}) overlaps hunk "
+                f"{previous['number']} ({previous['header']}); merge them into one hunk or fix the start lines."
+            )
+        new_start = hunk['index'] + offset + 1
+        header = f"@@ -{old_start},{old_count} +{new_start},{new_count} @@{hunk['trailer']}"
+        # filling in omitted counts is not a correction; only report changed numbers
+        if hunk['stated'] != (old_count, new_start, new_count):
+            notes.append(f"Hunk {hunk['number']}: corrected header {hunk['header']!r} to {header!r}.")
+        out.append(header)
+        out.extend(hunk['body'])
+        offset += new_count - old_count
+        previous = hunk
+
+    return '\n'.join(out) + '\n', notes
+
+
 # Backwards compatible name expected by the package-level API
 def apply_diff(original_text, unified_diff):
     """Backward-compatible wrapper around parse_diff."""
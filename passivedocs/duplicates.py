@@ -0,0 +1,45 @@
+"""Detection of byte-identical target files.
+
+Vendored copies, generated stubs and copy-pasted modules are documented once:
+the first file of each group gets a model conversation and the diffs accepted
+for it are replayed onto the other copies.
+"""
+import hashlib
+import os
+from typing import Dict, List
+
+from .diff import apply_diff
+
+
+# Files smaller than this are never grouped. Empty or near-empty files (most
+# often package ``__init__.py`` files) are identical by accident, and a
+# docstring written for one package would be wrong for all the others.
+MIN_DUPLICATE_SIZE = 128
+
+
+def group_duplicates(files: List[str], min_size: int = MIN_DUPLICATE_SIZE) -> Dict[str, List[str]]:
+    """Group byte-identical files by content hash.
+
+    Returns a mapping from the first file of each group (in ``files`` order) to
+    the remaining copies. Files with unique content, or smaller than
+    ``min_size`` bytes, are not included.
+    """
+    groups: Dict[str, List[str]] = {}
+    for f in files:
+        if os.path.getsize(f) < min_size:
+            continue
+        with open(f, 'rb') as fh:
+            digest = hashlib.sha256(fh.read()).hexdigest()
+        groups.setdefault(digest, []).append(f)
+    return {group[0]: group[1:] for group in groups.values() if len(group) > 1}
+
+
+def replay_diffs(content: str, diffs: List[str]) -> str:
+    """Apply ``diffs`` to ``content`` in order and return the result.
+
+    Raises ValueError if any diff does not apply; nothing is written, so the
+    caller can leave the file untouched.
+    """
+    for diff in diffs:
+        content = apply_diff(content, diff)
+    return content
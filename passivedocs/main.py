@@ -8,6 +8,10 @@ import sys
 
 from .agent import DocAgent
 from .config import Config
+from .duplicates import group_duplicates
+from .routing import Router
+from .sharding import parse_shard, select_shard
+from .symbols import SymbolIndex
 
 
 def prepare_context(repo_path: Path):
@@ -43,7 +47,39 @@ def get_target_files(repo_dir: Path, config: Config):
     for pattern in ignored_files:
         files = [f for f in files if not fnmatch(f, pattern)]
     files = [f for f in files if Path(f).is_file()]
-    return files
+    # sorted so every host sees the same order (glob order is filesystem dependent)
+    return sorted(files)
+
+
+def shard_option(ctx, param, value):
+    """Click callback turning 'i/N' into an (index, count) tuple."""
+    if value is None:
+        return None
+    try:
+        return parse_shard(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+
+def export_patch(repo_dir: Path, patch_path: Path) -> bool:
+    """Write the uncommitted changes in ``repo_dir`` to ``patch_path``. Returns False on failure."""
+    return os.system(f"cd {repo_dir} && git diff > {patch_path.resolve()}") == 0
+
+
+def resolve_work_dir(work_dir: str | None) -> Path:
+    # Work directory resolution order:
+    # 1. --work-dir CLI option (if provided)
+    # 2. WORK_DIR environment variable
+    # 3. default ./work for local runs
+    if work_dir:
+        env_work = work_dir
+    else:
+        env_work = os.environ.get("WORK_DIR", "./work")
+    WORK_DIR = Path(env_work)
+    if not WORK_DIR.exists():
+        logging.getLogger(__name__).debug("Creating work_dir: %s", WORK_DIR)
+        os.makedirs(WORK_DIR, exist_ok=True)
+    return WORK_DIR
 
 
 def setup_logging(log_file: str | None, level: str) -> None:
@@ -77,34 +113,31 @@ def make_pr(repo_dir: Path):
     os.system(f"cd {repo_dir} && git push origin docs")
 
 
+def common_options(f):
+    """Options shared by the passivedocs and passivedocs-merge commands."""
+    f = click.option("--work-dir", default=None, type=click.Path(), help="Optional work directory (overrides WORK_DIR env var).")(f)
+    f = click.option(
+        "--log-level",
+        default="INFO",
+        type=click.Choice(["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"], case_sensitive=True),
+        help="Logging level",
+    )(f)
+    f = click.option("--log-file", default=None, type=click.Path(), help="Optional path to write logs to.")(f)
+    return f
+
+
 @click.command()
-@click.option("--log-file", default=None, type=click.Path(), help="Optional path to write logs to.")
-@click.option(
-    "--log-level",
-    default="INFO",
-    type=click.Choice(["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"], case_sensitive=True),
-    help="Logging level",
-)
+@common_options
 @click.argument("repo_name")
-@click.option("--work-dir", default=None, type=click.Path(), help="Optional work directory (overrides WORK_DIR env var).")
-def main(repo_name, log_file, log_level, work_dir):
+@click.option("--shard", default=None, callback=shard_option, help="Only document shard i of N (0-based), e.g. 0/4. Writes a patch instead of pushing.")
+@click.option("--patch-out", default=None, type=click.Path(dir_okay=False), help="Patch file for --shard runs (default: <work-dir>/<repo>.shard-i-of-N.patch).")
+def main(repo_name, log_file, log_level, work_dir, shard, patch_out):
     setup_logging(log_file, log_level)
     logger = logging.getLogger(__name__)
 
     logger.info("Starting passivedocs for repo: %s", repo_name)
 
-    # Work directory resolution order:
-    # 1. --work-dir CLI option (if provided)
-    # 2. WORK_DIR environment variable
-    # 3. default ./work for local runs
-    if work_dir:
-        env_work = work_dir
-    else:
-        env_work = os.environ.get("WORK_DIR", "./work")
-    WORK_DIR = Path(env_work)
-    if not WORK_DIR.exists():
-        logger.debug("Creating work_dir: %s", WORK_DIR)
-        os.makedirs(WORK_DIR, exist_ok=True)
+    WORK_DIR = resolve_work_dir(work_dir)
 
     repo_dir = clone_repo(repo_name, WORK_DIR)
     logger.info("Cloned repository to %s", repo_dir)
@@ -115,12 +148,76 @@ def main(repo_name, log_file, log_level, work_dir):
     files = get_target_files(repo_dir, config)
     logger.info("Found %d target files to consider", len(files))
 
-    agent = DocAgent(readme=readme, files=files)
+    router = Router.from_config(config, repo_dir)
+    logger.info("Loaded %d model routing rules", len(router.routes))
+
+    duplicates = group_duplicates(files)
+    logger.info(
+        "Found %d groups of identical files (%d duplicate copies)",
+        len(duplicates),
+        sum(len(copies) for copies in duplicates.values()),
+    )
+
+    # index the whole repository so lookups work across shard boundaries
+    index = SymbolIndex.build(files)
+    logger.info("Indexed %d symbols across %d files", len(index), len(index.by_file))
+
+    # every shard lists the whole repository in its prompt, but only iterates its own files
+    shard_files = files
+    if shard is not None:
+        shard_files = select_shard(files, repo_dir, shard, duplicates)
+        duplicates = {rep: copies for rep, copies in duplicates.items() if rep in shard_files}
+        logger.info("Shard %d/%d: documenting %d of %d files", shard[0], shard[1], len(shard_files), len(files))
+
+    agent = DocAgent(
+        readme=readme,
+        files=shard_files,
+        router=router,
+        duplicates=duplicates,
+        index=index,
+        repo_files=files,
+    )
     logger.info("Initialized DocAgent; beginning iteration")
 
     agent.iterate()
     logger.info("passivedocs run complete")
 
+    if shard is not None:
+        patch_path = Path(patch_out) if patch_out else WORK_DIR / f"{repo_dir.name}.shard-{shard[0]}-of-{shard[1]}.patch"
+        if not export_patch(repo_dir, patch_path):
+            logger.error("Failed to write shard patch to %s; this shard's changes are only in %s", patch_path, repo_dir)
+            sys.exit(1)
+        logger.info("Wrote shard patch to %s", patch_path)
+        return
+
+    make_pr(repo_dir)
+
+
+@click.command()
+@common_options
+@click.argument("repo_name")
+@click.argument("patches", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+def merge(repo_name, patches, log_file, log_level, work_dir):
+    """Apply the patches written by --shard runs to one checkout and open a single PR."""
+    setup_logging(log_file, log_level)
+    logger = logging.getLogger(__name__)
+
+    # resolve before cloning; patch paths are relative to the caller's cwd
+    patch_paths = [Path(p).resolve() for p in patches]
+    WORK_DIR = resolve_work_dir(work_dir)
+
+    repo_dir = clone_repo(repo_name, WORK_DIR)
+    logger.info("Cloned repository to %s", repo_dir)
+
+    for patch in patch_paths:
+        if patch.stat().st_size == 0:
+            logger.warning("Patch %s is empty; that shard made no changes or failed to export them", patch)
+            continue
+        logger.info("Applying %s", patch)
+        if os.system(f"cd {repo_dir} && git apply {patch}") != 0:
+            logger.error("Failed to apply %s; aborting merge", patch)
+            sys.exit(1)
+
     make_pr(repo_dir)
 
 
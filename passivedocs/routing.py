@@ -0,0 +1,152 @@
+"""Per-file model routing.
+
+Routing rules live under the ``routing`` key of ``passivedocs.yml``. Each rule
+may match on a glob, a language, a size range (bytes) and/or an estimated token
+range, and maps matching files to a model and an optional endpoint. Rules are
+tried in order; the first rule whose conditions all hold wins. Files matching no
+rule fall back to the ``MODEL``/``ENDPOINT`` environment variables. Globs are
+matched against the path relative to the repository root, e.g. ``src/app.py``.
+
+Example::
+
+    routing:
+      - glob: "*.md"
+        model: "llama3.2:3b"
+      - language: python
+        min_tokens: 2000
+        model: "qwen2.5-coder:32b"
+        endpoint: "http://big-box:11434"
+"""
+import os
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Rough heuristic used by most tokenizers for source code and prose.
+CHARS_PER_TOKEN = 4
+
+LANGUAGES: Dict[str, str] = {
+    ".py": "python",
+    ".rs": "rust",
+    ".go": "go",
+    ".js": "javascript",
+    ".jsx": "javascript",
+    ".ts": "typescript",
+    ".tsx": "typescript",
+    ".java": "java",
+    ".kt": "kotlin",
+    ".c": "c",
+    ".h": "c",
+    ".cc": "cpp",
+    ".cpp": "cpp",
+    ".hpp": "cpp",
+    ".cs": "csharp",
+    ".rb": "ruby",
+    ".php": "php",
+    ".swift": "swift",
+    ".sh": "shell",
+    ".md": "markdown",
+    ".rst": "rst",
+    ".txt": "text",
+    ".yml": "yaml",
+    ".yaml": "yaml",
+    ".toml": "toml",
+    ".json": "json",
+}
+
+
+def detect_language(path: str) -> Optional[str]:
+    """Return the language name for ``path`` based on its extension, if known."""
+    return LANGUAGES.get(Path(path).suffix.lower())
+
+
+def estimate_tokens(size: int) -> int:
+    """Estimate the token count of a file from its size in bytes."""
+    return size // CHARS_PER_TOKEN
+
+
+class Route:
+    """A routing rule: match conditions plus the model/endpoint to use."""
+
+    def __init__(
+        self,
+        model: str,
+        endpoint: Optional[str] = None,
+        glob: Optional[str] = None,
+        language: Any = None,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        min_tokens: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+    ) -> None:
+        if not model:
+            raise ValueError("Routing rule requires a 'model'.")
+        self.model = model
+        self.endpoint = endpoint
+        self.glob = glob
+        # language may be given as a single name or a list of names
+        if isinstance(language, str):
+            language = [language]
+        self.languages = [lang.lower() for lang in language] if language else None
+        self.min_size = min_size
+        self.max_size = max_size
+        self.min_tokens = min_tokens
+        self.max_tokens = max_tokens
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Route":
+        known = {"model", "endpoint", "glob", "language", "min_size", "max_size", "min_tokens", "max_tokens"}
+        unknown = set(data) - known
+        if unknown:
+            raise ValueError(f"Unknown routing rule keys: {', '.join(sorted(unknown))}")
+        if not data.get("model"):
+            raise ValueError("Routing rule requires a 'model'.")
+        return cls(**data)
+
+    def matches(self, path: str, size: int) -> bool:
+        if self.glob is not None and not fnmatch(path, self.glob):
+            return False
+        if self.languages is not None and detect_language(path) not in self.languages:
+            return False
+        if self.min_size is not None and size < self.min_size:
+            return False
+        if self.max_size is not None and size > self.max_size:
+            return False
+        tokens = estimate_tokens(size)
+        if self.min_tokens is not None and tokens < self.min_tokens:
+            return False
+        if self.max_tokens is not None and tokens > self.max_tokens:
+            return False
+        return True
+
+
+class Router:
+    """Pick a model and endpoint for each file from an ordered list of rules.
+
+    ``route`` returns a ``(model, endpoint)`` pair. When no rule matches, or the
+    matching rule omits an endpoint, the environment defaults are used. Paths
+    are made relative to ``repo_dir`` (when given) before matching.
+    """
+
+    def __init__(self, routes: Optional[List[Route]] = None, repo_dir: Optional[Path] = None) -> None:
+        self.routes = routes or []
+        self.repo_dir = repo_dir
+
+    @classmethod
+    def from_config(cls, config: Any, repo_dir: Optional[Path] = None) -> "Router":
+        rules = config.data.get("routing", []) or []
+        return cls([Route.from_dict(rule) for rule in rules], repo_dir)
+
+    def route(self, path: str, size: Optional[int] = None) -> Tuple[Optional[str], Optional[str]]:
+        if size is None:
+            size = os.path.getsize(path)
+        default_model = os.environ.get("MODEL")
+        default_endpoint = os.environ.get("ENDPOINT")
+        if self.repo_dir is not None:
+            # same repository-relative form as sharding.shard_of
+            path = Path(os.path.relpath(path, self.repo_dir)).as_posix()
+        for rule in self.routes:
+            if rule.matches(path, size):
+                return rule.model, rule.endpoint or default_endpoint
+        return default_model, default_endpoint
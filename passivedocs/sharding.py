@@ -0,0 +1,38 @@
+"""Deterministic assignment of target files to shards.
+
+``--shard i/N`` runs document only the files whose repository-relative path
+hashes to shard ``i``. The hash does not depend on the clone location or on
+filesystem ordering, so every host computes the same disjoint split.
+"""
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse 'i/N' into an (index, count) tuple. Raises ValueError when malformed."""
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise ValueError("expected 'i/N', e.g. 0/4")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError("shard index must satisfy 0 <= i < N")
+    return index, count
+
+
+def shard_of(path: str, repo_dir: Path, count: int) -> int:
+    """Stable shard number for a file, based on its repository-relative path."""
+    rel = Path(os.path.relpath(path, repo_dir)).as_posix()
+    return int(hashlib.sha256(rel.encode('utf-8')).hexdigest(), 16) % count
+
+
+def select_shard(files: List[str], repo_dir: Path, shard: Tuple[int, int], duplicates: Dict[str, List[str]]) -> List[str]:
+    """Keep the files assigned to ``shard`` (an (index, count) tuple).
+
+    Copies of a duplicate group go to the shard of their representative, so a
+    group is never documented twice.
+    """
+    index, count = shard
+    owner = {copy: rep for rep, copies in duplicates.items() for copy in copies}
+    return [f for f in files if shard_of(owner.get(f, f), repo_dir, count) == index]
@@ -0,0 +1,379 @@
+"""Lightweight repository symbol index.
+
+The index is built once per run and lists the definitions in each file with
+their signature and line range. Python files are parsed with ``ast``; other
+languages use ctags-style regular expressions. The agent uses it to attach the
+signatures of symbols a file references to the initial messages and to answer
+``lookup(symbol)`` tool calls with just the definition snippet, instead of
+pasting whole files through ``view``.
+"""
+import ast
+import logging
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .routing import detect_language
+
+
+logger = logging.getLogger(__name__)
+
+
+# Longest definition snippet returned by lookup, in lines.
+MAX_SNIPPET_LINES = 60
+
+IDENTIFIER = re.compile(r"\b[A-Za-z_][A-Za-z0-9_]*\b")
+
+# ctags-style definition patterns; group "name" holds the symbol name.
+PATTERNS: Dict[str, List[re.Pattern]] = {
+    "rust": [
+        re.compile(r"^\s*(?:pub(?:\([^)]*\))?\s+)?(?:async\s+)?(?:unsafe\s+)?(?:const\s+)?fn\s+(?P<name>\w+)"),
+        re.compile(r"^\s*(?:pub(?:\([^)]*\))?\s+)?(?P<kind>struct|enum|trait|type|union)\s+(?P<name>\w+)"),
+        re.compile(r"^\s*(?:pub(?:\([^)]*\))?\s+)?(?:const|static)\s+(?P<name>[A-Z_][A-Z0-9_]*)\s*:"),
+    ],
+    "go": [
+        re.compile(r"^func\s+\(\s*\w*\s*\*?(?P<owner>\w+)[^)]*\)\s*(?P<name>\w+)"),
+        re.compile(r"^func\s+(?P<name>\w+)"),
+        re.compile(r"^type\s+(?P<name>\w+)"),
+    ],
+    "javascript": [
+        re.compile(r"^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?function\s*\*?\s*(?P<name>\w+)"),
+        re.compile(r"^\s*(?:export\s+)?(?:default\s+)?class\s+(?P<name>\w+)"),
+        re.compile(r"^\s*(?:export\s+)?(?:const|let|var)\s+(?P<name>\w+)\s*=\s*(?:async\s+)?(?:function|\([^)]*\)\s*=>|\w+\s*=>)"),
+    ],
+    "typescript": [
+        re.compile(r"^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?function\s*\*?\s*(?P<name>\w+)"),
+        re.compile(r"^\s*(?:export\s+)?(?:default\s+)?(?:abstract\s+)?(?P<kind>class|interface|type|enum)\s+(?P<name>\w+)"),
+        re.compile(r"^\s*(?:export\s+)?(?:const|let|var)\s+(?P<name>\w+)\s*(?::[^=]+)?=\s*(?:async\s+)?(?:function|\([^)]*\)\s*(?::[^=]+)?=>|\w+\s*=>)"),
+    ],
+    "java": [
+        re.compile(r"^\s*(?:(?:public|protected|private|static|final|abstract|sealed)\s+)*(?P<kind>class|interface|enum|record)\s+(?P<name>\w+)"),
+        re.compile(r"^\s*(?:(?:public|protected|private|static|final|abstract|synchronized)\s+)+[\w<>\[\], ]+\s+(?P<name>\w+)\s*\("),
+    ],
+    "kotlin": [
+        re.compile(r"^\s*(?:\w+\s+)*fun\s+(?:<[^>]*>\s*)?(?:\w+\.)?(?P<name>\w+)\s*\("),
+        re.compile(r"^\s*(?:\w+\s+)*(?P<kind>class|interface|object)\s+(?P<name>\w+)"),
+    ],
+    "csharp": [
+        re.compile(r"^\s*(?:(?:public|protected|private|internal|static|sealed|abstract|partial)\s+)*(?P<kind>class|interface|struct|enum|record)\s+(?P<name>\w+)"),
+        re.compile(r"^\s*(?:(?:public|protected|private|internal|static|virtual|override|async)\s+)+[\w<>\[\], ]+\s+(?P<name>\w+)\s*\("),
+    ],
+    "c": [
+        re.compile(r"^(?!\s)(?!return\b)[\w\s\*]+?\b(?P<name>\w+)\s*\([^;]*$"),
+        re.compile(r"^\s*(?:typedef\s+)?(?P<kind>struct|enum|union)\s+(?P<name>\w+)"),
+        re.compile(r"^#define\s+(?P<name>\w+)"),
+    ],
+    "ruby": [
+        re.compile(r"^\s*def\s+(?:self\.)?(?P<name>\w+[?!=]?)"),
+        re.compile(r"^\s*(?P<kind>class|module)\s+(?P<name>\w+)"),
+    ],
+    "php": [
+        re.compile(r"^\s*(?:(?:public|protected|private|static|abstract|final)\s+)*function\s+(?P<name>\w+)"),
+        re.compile(r"^\s*(?:abstract\s+|final\s+)?(?P<kind>class|interface|trait)\s+(?P<name>\w+)"),
+    ],
+    "swift": [
+        re.compile(r"^\s*(?:\w+\s+)*func\s+(?P<name>\w+)"),
+        re.compile(r"^\s*(?:\w+\s+)*(?P<kind>class|struct|enum|protocol)\s+(?P<name>\w+)"),
+    ],
+}
+PATTERNS["cpp"] = PATTERNS["c"] + [re.compile(r"^\s*(?:template\s*<[^>]*>\s*)?(?P<kind>class|struct|namespace)\s+(?P<name>\w+)")]
+
+# Blocks that add members to a type defined elsewhere; they qualify the
+# definitions inside them but are not symbols themselves.
+EXTENSION_PATTERNS: Dict[str, List[re.Pattern]] = {
+    "rust": [re.compile(r"^\s*(?:unsafe\s+)?impl\b(?:\s*<[^{]*?>)?\s+(?:[\w:]+(?:<[^{]*?>)?\s+for\s+)?(?:[\w]+::)*(?P<name>\w+)")],
+    "swift": [re.compile(r"^\s*(?:\w+\s+)*extension\s+(?P<name>\w+)")],
+}
+
+# Symbol kinds whose brace block encloses member definitions.
+CONTAINER_KINDS = {"class", "struct", "enum", "trait", "interface", "object", "record", "module", "protocol", "union", "namespace", "impl"}
+
+
+class Symbol:
+    """A single definition: where it lives and how it is declared."""
+
+    def __init__(self, name: str, kind: str, path: str, line: int, end_line: int, signature: str) -> None:
+        self.name = name
+        self.kind = kind
+        self.path = path
+        self.line = line
+        self.end_line = end_line
+        self.signature = signature
+
+    def __repr__(self) -> str:
+        return f"Symbol({self.name!r}, {self.kind!r}, {self.path!r}, {self.line})"
+
+
+def _python_symbols(path: str, source: str) -> List[Symbol]:
+    tree = ast.parse(source)
+    lines = source.splitlines()
+    symbols: List[Symbol] = []
+
+    def header(node: ast.AST) -> str:
+        # the declaration runs from the def/class line to the line before the body
+        end = max(node.lineno, node.body[0].lineno - 1)
+        text = " ".join(ln.strip() for ln in lines[node.lineno - 1:end])
+        return text if len(text) <= 300 else text[:300] + " ..."
+
+    def visit(nodes: Iterable[ast.AST], prefix: str) -> None:
+        for node in nodes:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                kind = "class" if isinstance(node, ast.ClassDef) else ("method" if prefix else "function")
+                start = node.decorator_list[0].lineno if node.decorator_list else node.lineno
+                symbols.append(Symbol(prefix + node.name, kind, path, start, node.end_lineno or node.lineno, header(node)))
+                if isinstance(node, ast.ClassDef):
+                    visit(node.body, prefix + node.name + ".")
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)) and not prefix:
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                for target in targets:
+                    if isinstance(target, ast.Name) and target.id.isupper():
+                        signature = lines[node.lineno - 1].strip()
+                        symbols.append(Symbol(target.id, "constant", path, node.lineno, node.end_lineno or node.lineno, signature[:300]))
+
+    visit(tree.body, "")
+    return symbols
+
+
+def _regex_symbols(path: str, source: str, patterns: List[re.Pattern], extensions: List[re.Pattern]) -> List[Symbol]:
+    lines = source.splitlines()
+    starts: List[Symbol] = []
+    owners: Dict[int, str] = {}  # position in starts -> receiver type (Go methods)
+    for idx, line in enumerate(lines, start=1):
+        for pattern in extensions:
+            match = pattern.match(line)
+            if match:
+                starts.append(Symbol(match.group("name"), "impl", path, idx, idx, line.strip()[:300]))
+                break
+        else:
+            for pattern in patterns:
+                match = pattern.match(line)
+                if match:
+                    groups = match.groupdict()
+                    if groups.get("owner"):
+                        owners[len(starts)] = groups["owner"]
+                    kind = groups.get("kind") or "function"
+                    starts.append(Symbol(match.group("name"), kind, path, idx, idx, line.strip()[:300]))
+                    break
+    # a definition ends where its braces balance; brace-less definitions end
+    # at a ';' or before the next definition
+    for pos, sym in enumerate(starts):
+        next_start = starts[pos + 1].line if pos + 1 < len(starts) else len(lines) + 1
+        depth = 0
+        opened = False
+        end = sym.line
+        for idx in range(sym.line, len(lines) + 1):
+            if not opened and idx >= next_start:
+                break
+            text = lines[idx - 1]
+            depth += text.count("{") - text.count("}")
+            opened = opened or "{" in text
+            end = idx
+            if (opened and depth <= 0) or (not opened and text.rstrip().endswith(";")):
+                break
+        sym.end_line = end
+    # qualify members with the innermost enclosing type (or Go receiver) as 'Type.member'
+    symbols: List[Symbol] = []
+    for pos, sym in enumerate(starts):
+        owner = owners.get(pos)
+        if owner is None:
+            enclosing = [
+                other for other in starts[:pos]
+                if other.kind in CONTAINER_KINDS and other.line < sym.line <= other.end_line
+            ]
+            if enclosing:
+                owner = enclosing[-1].name
+        if owner:
+            sym.name = f"{owner}.{sym.name}"
+            if sym.kind == "function":
+                sym.kind = "method"
+        if sym.kind != "impl":
+            symbols.append(sym)
+    return symbols
+
+
+def extract_symbols(path: str, source: str) -> List[Symbol]:
+    """Return the definitions found in ``source``. Unsupported languages yield none."""
+    language = detect_language(path)
+    if language == "python":
+        return _python_symbols(path, source)
+    if language in PATTERNS:
+        return _regex_symbols(path, source, PATTERNS[language], EXTENSION_PATTERNS.get(language, []))
+    return []
+
+
+# Import/use statements per language; identifiers inside a match count as imported.
+IMPORT_PATTERNS: Dict[str, List[re.Pattern]] = {
+    "rust": [re.compile(r"^\s*(?:pub(?:\([^)]*\))?\s+)?use\s+([^;]+);", re.M)],
+    "go": [re.compile(r"^\s*import\s+(\([^)]*\)|.+)$", re.M)],
+    "javascript": [
+        re.compile(r"^\s*import\s+([^;]*?)\s+from\b", re.M),
+        re.compile(r"^\s*(?:const|let|var)\s+(\{[^}]*\}|\w+)\s*=\s*require\(", re.M),
+    ],
+    "java": [re.compile(r"^\s*import\s+(?:static\s+)?([\w.]+)", re.M)],
+    "kotlin": [re.compile(r"^\s*import\s+([\w.]+)", re.M)],
+    "csharp": [re.compile(r"^\s*using\s+(?:static\s+)?([\w.]+)\s*;", re.M)],
+    "php": [re.compile(r"^\s*use\s+([^;]+);", re.M)],
+    "swift": [re.compile(r"^\s*import\s+(?:\w+\s+)?([\w.]+)", re.M)],
+    "ruby": [re.compile(r"^\s*require(?:_relative)?\s+['\"]([^'\"]+)", re.M)],
+}
+IMPORT_PATTERNS["typescript"] = IMPORT_PATTERNS["javascript"]
+
+# Words that appear inside import statements but never name a symbol.
+IMPORT_KEYWORDS = {"use", "import", "from", "as", "pub", "crate", "self", "super", "static", "type", "typeof", "default"}
+
+# 'X::y', 'X.y' and 'X->y' member access.
+QUALIFIED = re.compile(r"\b([A-Za-z_][A-Za-z0-9_]*)\s*(?:::|\.|->)\s*([A-Za-z_][A-Za-z0-9_]*)")
+
+# Plain identifiers defined in more places than this are too ambiguous
+# (new, default, fmt, ...) to attach without an import or qualifier.
+MAX_AMBIGUOUS_DEFINITIONS = 3
+
+
+def ranked_references(path: str, source: str) -> Tuple[Set[str], Set[str], Set[str]]:
+    """Return the names ``source`` refers to as (imported, qualified, other).
+
+    Imported names come from import/use statements; qualified names are the
+    ``X.y`` keys of ``X::y``/``X.y`` member access. ``other`` holds the remaining
+    plain identifiers, including the bare ``X`` and ``y`` parts of qualified
+    access, which are the weakest evidence of a reference.
+    """
+    imported: Set[str] = set()
+    qualified: Set[str] = set()
+    other: Set[str] = set()
+    language = detect_language(path)
+    tree = None
+    if language == "python":
+        try:
+            tree = ast.parse(source)
+        except SyntaxError:
+            pass
+    if tree is not None:
+        for node in ast.walk(tree):
+            if isinstance(node, ast.alias):
+                imported.add((node.asname or node.name).split(".")[0])
+                imported.add(node.name.split(".")[-1])
+            elif isinstance(node, ast.Attribute):
+                other.add(node.attr)
+                if isinstance(node.value, ast.Name):
+                    qualified.add(f"{node.value.id}.{node.attr}")
+            elif isinstance(node, ast.Name):
+                other.add(node.id)
+    else:
+        for pattern in IMPORT_PATTERNS.get(language or "", []):
+            for match in pattern.finditer(source):
+                imported.update(set(IDENTIFIER.findall(match.group(1))) - IMPORT_KEYWORDS)
+        for owner, member in QUALIFIED.findall(source):
+            qualified.add(f"{owner}.{member}")
+        other.update(IDENTIFIER.findall(source))
+    qualified -= imported
+    other -= imported | qualified
+    return imported, qualified, other
+
+
+def referenced_names(path: str, source: str) -> Set[str]:
+    """Return the identifiers ``source`` imports or refers to."""
+    imported, qualified, other = ranked_references(path, source)
+    return imported | qualified | other
+
+
+def _member(name: str) -> str:
+    """Last component of a possibly qualified symbol name."""
+    return name.rsplit(".", 1)[-1]
+
+
+class SymbolIndex:
+    """Definitions across the repository, keyed by symbol name.
+
+    Methods are indexed by their qualified ``Class.method`` name and also by
+    bare member name, so ``find`` matches ``method``, ``Class.method`` and
+    ``Class::method``.
+    """
+
+    def __init__(self) -> None:
+        self.symbols: Dict[str, List[Symbol]] = {}
+        self.by_member: Dict[str, List[Symbol]] = {}
+        self.by_file: Dict[str, List[Symbol]] = {}
+
+    @classmethod
+    def build(cls, files: Iterable[str]) -> "SymbolIndex":
+        index = cls()
+        for path in files:
+            index.update(path)
+        return index
+
+    def update(self, path: str) -> None:
+        """(Re-)index ``path``, replacing any entries from an earlier version of it."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                source = f.read()
+            found = extract_symbols(path, source)
+        except (OSError, UnicodeDecodeError, SyntaxError, ValueError) as e:
+            # drop stale entries; their line ranges no longer describe the file
+            logger.debug("Skipping %s in symbol index: %s", path, e)
+            found = []
+        self.add(path, found)
+
+    def add(self, path: str, symbols: List[Symbol]) -> None:
+        for old in self.by_file.get(path, []):
+            for table, key in ((self.symbols, old.name), (self.by_member, _member(old.name))):
+                remaining = [sym for sym in table.get(key, []) if sym.path != path]
+                if remaining:
+                    table[key] = remaining
+                else:
+                    table.pop(key, None)
+        self.by_file[path] = symbols
+        for sym in symbols:
+            self.symbols.setdefault(sym.name, []).append(sym)
+            self.by_member.setdefault(_member(sym.name), []).append(sym)
+
+    def __len__(self) -> int:
+        return sum(len(syms) for syms in self.by_file.values())
+
+    def find(self, name: str) -> List[Symbol]:
+        name = name.replace("::", ".").replace("->", ".")
+        if "." in name:
+            return list(self.symbols.get(name, []))
+        return list(self.by_member.get(name, []))
+
+    def signatures_for(self, path: str, source: str, limit: int = 40) -> str:
+        """Render signatures of symbols ``source`` references that are defined in other files.
+
+        Imported names come first, then qualified references, then plain
+        identifiers; ambiguous plain identifiers are left out entirely.
+        """
+        own = {sym.name for sym in self.by_file.get(path, [])}
+        own |= {_member(name) for name in own}
+        tiers = ranked_references(path, source)
+        found: List[Symbol] = []
+        seen: Set[int] = set()
+        for rank, names in enumerate(tiers):
+            tier: List[Symbol] = []
+            for name in names - own:
+                candidates = self.find(name)
+                if rank == len(tiers) - 1 and len(candidates) > MAX_AMBIGUOUS_DEFINITIONS:
+                    continue
+                defs = [sym for sym in candidates if sym.path != path and id(sym) not in seen]
+                seen.update(id(sym) for sym in defs)
+                tier.extend(defs)
+            found.extend(sorted(tier, key=lambda sym: (sym.path, sym.line)))
+        lines = [f"{sym.path}:{sym.line}: {sym.signature}" for sym in found[:limit]]
+        if len(found) > limit:
+            lines.append(f"... {len(found) - limit} more; use lookup(symbol) for others.")
+        return "\n".join(lines)
+
+    def lookup(self, name: str, max_results: int = 3) -> Optional[str]:
+        """Return the source of up to ``max_results`` definitions of ``name``, or None."""
+        matches = self.find(name)
+        if not matches:
+            return None
+        snippets: List[str] = []
+        for sym in matches[:max_results]:
+            with open(sym.path, "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            end = min(sym.end_line, sym.line + MAX_SNIPPET_LINES - 1)
+            body = "\n".join(lines[sym.line - 1:end])
+            if end < sym.end_line:
+                body += f"\n... ({sym.end_line - end} more lines)"
+            snippets.append(f"{sym.path}:{sym.line}-{end} ({sym.kind} {sym.name}):\n{body}")
+        if len(matches) > max_results:
+            snippets.append(f"... {len(matches) - max_results} more definitions of {name}.")
+        return "\n\n".join(snippets)
@@ -13,7 +13,8 @@ setup(
     ],
     entry_points={
         "console_scripts": [
-            "passivedocs=passivedocs.main:main"
+            "passivedocs=passivedocs.main:main",
+            "passivedocs-merge=passivedocs.main:merge",
         ]
     },
     author="",
@@ -0,0 +1,112 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('ollama')
+pytest.importorskip('dotenv')
+
+import passivedocs.agent as agent_module  # noqa: E402
+from passivedocs.agent import DocAgent  # noqa: E402
+from passivedocs.routing import Route, Router  # noqa: E402
+
+
+def _call(name, **arguments):
+    return SimpleNamespace(function=SimpleNamespace(name=name, arguments=json.dumps(arguments)))
+
+
+class FakeClient:
+    """Answers every conversation with one diff and then next()."""
+
+    def __init__(self, diff_header, diff_body):
+        self.diff = _call('diff', header=diff_header, diff=diff_body)
+        self.documented = []
+        self.models = []
+        self._pending = False
+
+    def chat(self, model, messages, **kwargs):
+        self.models.append(model)
+        if not self._pending:
+            self._pending = True
+            self.documented.append(messages[1].content)
+            calls = [self.diff]
+        else:
+            self._pending = False
+            calls = [_call('next')]
+        return SimpleNamespace(message=SimpleNamespace(role='assistant', content='', tool_calls=calls))
+
+
+BODY = 'def shared():\n    return 1\n' * 10
+
+
+def test_duplicates_are_documented_once_and_replayed(tmp_path):
+    """Copies skip the model and receive the representative's diffs."""
+    rep, copy = tmp_path / 'a.py', tmp_path / 'b.py'
+    rep.write_text(BODY)
+    copy.write_text(BODY)
+    client = FakeClient('@@ -0,0 +1,1 @@', '+"""Shared helpers."""\n')
+    agent = DocAgent(readme='', files=[str(rep), str(copy)], client=client, duplicates={str(rep): [str(copy)]})
+
+    agent.iterate()
+
+    assert len(client.documented) == 1
+    assert rep.read_text() == '"""Shared helpers."""\n' + BODY
+    assert copy.read_text() == rep.read_text()
+    assert agent.conversations_saved == 1
+
+
+def test_failed_replay_leaves_copy_untouched(tmp_path):
+    """A copy that no longer matches is not half-patched and not counted."""
+    rep, copy = tmp_path / 'a.py', tmp_path / 'b.py'
+    rep.write_text(BODY)
+    copy.write_text('changed\n' + BODY)
+    client = FakeClient('@@ -1,1 +1,2 @@', '+"""Shared helpers."""\n def shared():\n')
+    agent = DocAgent(readme='', files=[str(rep), str(copy)], client=client, duplicates={str(rep): [str(copy)]})
+
+    agent.iterate()
+
+    assert copy.read_text() == 'changed\n' + BODY
+    assert agent.conversations_saved == 0
+
+
+def test_prompt_lists_repo_files_not_just_shard(tmp_path):
+    """A shard's prompt lists every target file, while it iterates only its own."""
+    mine, other = tmp_path / 'a.py', tmp_path / 'b.py'
+    mine.write_text('x = 1\n')
+    other.write_text('y = 2\n')
+    agent = DocAgent(readme='', files=[str(mine)], client=FakeClient('', ''), repo_files=[str(mine), str(other)])
+    assert str(other) in agent.system_prompt
+    assert agent.files == [str(mine)]
+
+
+def test_routed_model_and_endpoint_reach_chat(tmp_path, monkeypatch):
+    """Each file is sent to its routed model, one client per endpoint, with stats per model."""
+    monkeypatch.setenv('MODEL', 'default-model')
+    monkeypatch.delenv('ENDPOINT', raising=False)
+    created = {}
+
+    def make_client(host=None):
+        created[host] = FakeClient('@@ -0,0 +1,1 @@', '+# doc\n')
+        return created[host]
+
+    monkeypatch.setattr(agent_module.ollama, 'Client', make_client)
+    (tmp_path / 'src').mkdir()
+    files = [tmp_path / 'src' / 'a.py', tmp_path / 'src' / 'b.py', tmp_path / 'notes.md']
+    for f in files:
+        f.write_text('x = 1\n')
+    router = Router(
+        [Route(model='big', glob='src/*.py', endpoint='http://big:11434'), Route(model='small', glob='*.md')],
+        repo_dir=tmp_path,
+    )
+    default = FakeClient('@@ -0,0 +1,1 @@', '+# doc\n')
+    agent = DocAgent(readme='', files=[str(f) for f in files], client=default, router=router)
+
+    agent.iterate()
+
+    assert list(created) == ['http://big:11434']
+    assert created['http://big:11434'].models == ['big'] * 4
+    assert default.models == ['small'] * 2
+    assert agent.model_stats['big']['files'] == 2
+    assert agent.model_stats['big']['calls'] == 4
+    assert agent.model_stats['big']['bytes'] == 2 * len('x = 1\n')
+    assert agent.model_stats['small']['files'] == 1
@@ -1,5 +1,5 @@
 import pytest
-from passivedocs.diff import parse_diff  # Assuming your function is in a file named 'your_module.py'
+from passivedocs.diff import parse_diff, repair_diff  # Assuming your function is in a file named 'your_module.py'
 
 def test_apply_simple_diff():
     """Tests a simple replacement of one line and an addition."""
@@ -163,4 +163,134 @@ def test_context_only_hunk_noop():
  three
 """
     modified = parse_diff(orig, diff)
-    assert modified == orig
\ No newline at end of file
+    assert modified == orig
+
+def test_repair_fixes_header_counts():
+    """Wrong counts in hunk headers are recomputed from the body."""
+    orig = 'one\ntwo\nthree\nfour\nfive\nsix\n'
+    diff = """@@ -1,2 +1,2 @@
+ one
++uno
+ two
+@@ -5,1 +9,9 @@
+ five
++cinco
+ six
+"""
+    repaired, notes = repair_diff(diff)
+    assert repaired.splitlines()[0] == '@@ -1,2 +1,3 @@'
+    assert '@@ -5,2 +6,3 @@' in repaired.splitlines()
+    assert len(notes) == 2
+    modified = parse_diff(orig, repaired)
+    assert modified.splitlines() == ['one', 'uno', 'two', 'three', 'four', 'five', 'cinco', 'six']
+
+
+def test_repair_leaves_valid_diff_untouched():
+    """A correct multi-hunk diff produces no repair notes."""
+    diff = """@@ -1,3 +1,3 @@
+ one
+-two
++TWO
+ three
+@@ -4,3 +4,3 @@
+ four
+-five
++FIVE
+ six
+"""
+    repaired, notes = repair_diff(diff)
+    assert repaired == diff
+    assert notes == []
+
+
+def test_repair_reorders_hunks_and_drops_separators():
+    """Out-of-order hunks are sorted and blank separator lines are ignored."""
+    diff = """@@ -4,1 +4,2 @@
+ four
++4
+
+@@ -1,1 +1,2 @@
+ one
++1
+"""
+    repaired, notes = repair_diff(diff)
+    assert repaired.splitlines() == ['@@ -1,1 +1,2 @@', ' one', '+1', '@@ -4,1 +5,2 @@', ' four', '+4']
+    assert 'Reordered hunks by original start line.' in notes
+
+
+def test_repair_empty_line_inside_hunk_is_context():
+    """A bare empty line between body lines is an empty context line."""
+    repaired, _ = repair_diff('@@ -1,3 +1,4 @@\n a\n\n+b\n c\n')
+    assert parse_diff('a\n\nc\n', repaired) == 'a\n\nb\nc\n'
+
+
+def test_repair_rejects_bad_prefix():
+    """Body lines without a valid prefix are reported with hunk and line."""
+    with pytest.raises(ValueError, match='Hunk 1: body line 2'):
+        repair_diff('@@ -1,2 +1,2 @@\n a\nb\n')
+
+
+def test_repair_rejects_overlapping_hunks():
+    """Hunks covering the same original lines cannot be repaired."""
+    with pytest.raises(ValueError, match='overlaps'):
+        repair_diff('@@ -1,2 +1,2 @@\n a\n b\n@@ -2,1 +2,1 @@\n b\n')
+
+
+def test_repair_rejects_missing_header():
+    """A diff without any hunk header is rejected."""
+    with pytest.raises(ValueError, match='No hunk header'):
+        repair_diff(' a\n+b\n')
+
+
+def test_context_mismatch_reports_line():
+    """Mismatch errors name the file line and both versions."""
+    with pytest.raises(ValueError, match="line 2 is 'b', diff expects 'x'"):
+        parse_diff('a\nb\n', '@@ -1,2 +1,2 @@\n a\n x\n')
+
+
+def test_pure_insertion_goes_after_line():
+    """A '-a,0' hunk inserts after line a, and a correct header is kept as is."""
+    diff = '@@ -2,0 +3,1 @@\n+X\n'
+    repaired, notes = repair_diff(diff)
+    assert repaired == diff
+    assert notes == []
+    assert parse_diff('a\nb\nc\n', repaired) == 'a\nb\nX\nc\n'
+
+
+def test_pure_insertion_at_start_of_file():
+    """'-0,0' inserts before the first line."""
+    repaired, notes = repair_diff('@@ -0,0 +1,1 @@\n+X\n')
+    assert notes == []
+    assert parse_diff('a\n', repaired) == 'X\na\n'
+
+
+def test_repair_rejects_ambiguous_insertion():
+    """Added lines without context under a non-zero old count are rejected."""
+    with pytest.raises(ValueError, match='at least one context line'):
+        repair_diff('@@ -2,1 +2,2 @@\n+X\n')
+
+
+def test_repair_omitted_counts_are_not_corrections():
+    """Filling in omitted counts does not produce a correction note."""
+    repaired, notes = repair_diff('@@ -1 +1 @@\n-a\n+b\n')
+    assert repaired.splitlines()[0] == '@@ -1,1 +1,1 @@'
+    assert notes == []
+
+
+def test_pure_insertion_with_new_start_equal_to_old_start_goes_before():
+    """'-a,0 +a,n' says the new lines take line a's place; it is kept and applied before line a."""
+    orig = 'a\nfn foo() {\n}\n'
+    diff = '@@ -2,0 +2,1 @@\n+/// Foo docs\n'
+    repaired, notes = repair_diff(diff)
+    assert repaired == diff
+    assert notes == []
+    assert parse_diff(orig, repaired) == 'a\n/// Foo docs\nfn foo() {\n}\n'
+
+
+def test_pure_insertion_after_earlier_hunk_uses_offset():
+    """The before/after reading of an insertion accounts for lines added earlier."""
+    orig = 'a\nb\nc\nd\n'
+    diff = '@@ -1,1 +1,2 @@\n a\n+a2\n@@ -3,0 +4,1 @@\n+X\n'
+    repaired, notes = repair_diff(diff)
+    assert notes == []
+    assert parse_diff(orig, repaired) == 'a\na2\nb\nX\nc\nd\n'
@@ -0,0 +1,42 @@
+import pytest
+from passivedocs.duplicates import group_duplicates, replay_diffs
+
+
+BODY = 'def shared():\n    return 1\n' * 10
+
+
+def test_groups_identical_files_in_order(tmp_path):
+    """The first file of a group is the representative; others are copies."""
+    paths = []
+    for name, content in [('a.py', BODY), ('b.py', BODY + '# other\n'), ('c.py', BODY), ('d.py', BODY)]:
+        path = tmp_path / name
+        path.write_text(content)
+        paths.append(str(path))
+    assert group_duplicates(paths) == {paths[0]: [paths[2], paths[3]]}
+
+
+def test_small_and_empty_files_are_not_grouped(tmp_path):
+    """Empty __init__.py files are identical by accident and stay separate."""
+    paths = []
+    for pkg in ['one', 'two', 'three']:
+        (tmp_path / pkg).mkdir()
+        path = tmp_path / pkg / '__init__.py'
+        path.write_text('')
+        paths.append(str(path))
+    tiny = [tmp_path / 'x.py', tmp_path / 'y.py']
+    for path in tiny:
+        path.write_text('import os\n')
+    assert group_duplicates(paths + [str(p) for p in tiny]) == {}
+
+
+def test_replay_diffs_applies_in_order():
+    """Diffs are applied one after another to the in-memory content."""
+    diffs = ['@@ -1,1 +1,2 @@\n+"""Doc."""\n a\n', '@@ -2,1 +2,2 @@\n a\n+b\n']
+    assert replay_diffs('a\n', diffs) == '"""Doc."""\na\nb\n'
+
+
+def test_replay_diffs_raises_without_partial_result():
+    """A diff that does not apply raises instead of returning half-patched text."""
+    diffs = ['@@ -1,1 +1,2 @@\n a\n+b\n', '@@ -1,1 +1,1 @@\n-zzz\n+y\n']
+    with pytest.raises(ValueError):
+        replay_diffs('a\n', diffs)
@@ -0,0 +1,56 @@
+from pathlib import Path
+
+import pytest
+from passivedocs.routing import Route, Router, detect_language
+
+
+def test_detect_language():
+    """Languages are detected from the file extension."""
+    assert detect_language('src/app.py') == 'python'
+    assert detect_language('README.MD') == 'markdown'
+    assert detect_language('Makefile') is None
+
+
+def test_first_matching_rule_wins(monkeypatch):
+    """Rules are evaluated in order and the first match is used."""
+    monkeypatch.setenv('MODEL', 'default-model')
+    monkeypatch.setenv('ENDPOINT', 'http://default:11434')
+    router = Router([
+        Route(model='small', glob='*.md'),
+        Route(model='big', language='python', min_tokens=1000, endpoint='http://big:11434'),
+        Route(model='medium', language=['python', 'rust']),
+    ])
+    assert router.route('repo/README.md', 50000) == ('small', 'http://default:11434')
+    assert router.route('repo/a.py', 8000) == ('big', 'http://big:11434')
+    assert router.route('repo/a.py', 100) == ('medium', 'http://default:11434')
+    assert router.route('repo/a.go', 100) == ('default-model', 'http://default:11434')
+
+
+def test_size_bounds_are_inclusive():
+    """min_size and max_size bound the byte size inclusively."""
+    rule = Route(model='m', min_size=10, max_size=20)
+    assert rule.matches('f', 10)
+    assert rule.matches('f', 20)
+    assert not rule.matches('f', 9)
+    assert not rule.matches('f', 21)
+
+
+def test_unknown_rule_key_raises():
+    """Typos in routing rules are reported instead of silently ignored."""
+    with pytest.raises(ValueError):
+        Route.from_dict({'model': 'm', 'globb': '*.py'})
+
+
+def test_rule_requires_model():
+    """A rule without a model is rejected."""
+    with pytest.raises(ValueError):
+        Route.from_dict({'glob': '*.py'})
+
+
+def test_glob_matches_repository_relative_path(monkeypatch):
+    """Globs see 'src/a.py', not the clone location."""
+    monkeypatch.setenv('MODEL', 'default-model')
+    router = Router([Route(model='small', glob='src/*.py')], repo_dir=Path('work/repo'))
+    assert router.route('work/repo/src/a.py', 10)[0] == 'small'
+    assert router.route('work/repo/lib/a.py', 10)[0] == 'default-model'
+    assert Router([Route(model='small', glob='*.md')], repo_dir=Path('/abs/repo')).route('/abs/repo/README.md', 10)[0] == 'small'
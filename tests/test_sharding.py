@@ -0,0 +1,47 @@
+from pathlib import Path
+
+import pytest
+from passivedocs.sharding import parse_shard, select_shard, shard_of
+
+
+REPO = Path('work/repo')
+FILES = [str(REPO / f'pkg{i}' / f'mod{j}.py') for i in range(5) for j in range(8)]
+
+
+def test_parse_shard():
+    """'i/N' parses to a 0-based index and a count."""
+    assert parse_shard('0/4') == (0, 4)
+    assert parse_shard('3/4') == (3, 4)
+
+
+@pytest.mark.parametrize('value', ['4/4', '-1/4', '0/0', '1', 'a/b', '1/2/3', ''])
+def test_parse_shard_rejects_bad_input(value):
+    """Out-of-range or malformed specs are rejected."""
+    with pytest.raises(ValueError):
+        parse_shard(value)
+
+
+def test_shard_of_is_independent_of_clone_location():
+    """Assignment depends only on the repository-relative path."""
+    for f in FILES:
+        rel = Path(f).relative_to(REPO)
+        assert shard_of(f, REPO, 4) == shard_of(str(Path('/elsewhere/clone') / rel), Path('/elsewhere/clone'), 4)
+
+
+def test_shards_are_disjoint_and_cover_all_files():
+    """Every file lands in exactly one shard, and the split is repeatable."""
+    shards = [select_shard(FILES, REPO, (i, 3), {}) for i in range(3)]
+    assert sorted(f for shard in shards for f in shard) == sorted(FILES)
+    assert all(len(shard) > 0 for shard in shards)
+    assert shards == [select_shard(list(FILES), REPO, (i, 3), {}) for i in range(3)]
+
+
+def test_duplicates_follow_their_representative():
+    """Copies are assigned to the shard of their group's representative."""
+    rep = FILES[0]
+    copies = FILES[1:6]
+    duplicates = {rep: copies}
+    home = shard_of(rep, REPO, 4)
+    for i in range(4):
+        selected = select_shard(FILES, REPO, (i, 4), duplicates)
+        assert all((f in selected) == (i == home) for f in [rep] + copies)
@@ -0,0 +1,160 @@
+from passivedocs.symbols import SymbolIndex, extract_symbols, referenced_names
+
+
+PY_SOURCE = '''import os
+
+MAX_SIZE = 10
+
+
+@decorator
+def helper(a, b=1) -> int:
+    """Add things."""
+    return a + b
+
+
+class Widget(Base):
+    def render(self,
+               width: int) -> str:
+        return str(width)
+'''
+
+RUST_SOURCE = '''pub struct Point {
+    x: i32,
+}
+
+impl Point {
+    pub fn norm(&self) -> i32 {
+        self.x
+    }
+}
+'''
+
+
+def test_python_symbols_and_signatures():
+    """Python definitions are indexed with their declaration line as signature."""
+    symbols = {sym.name: sym for sym in extract_symbols('pkg/mod.py', PY_SOURCE)}
+    assert set(symbols) == {'MAX_SIZE', 'helper', 'Widget', 'Widget.render'}
+    assert symbols['helper'].signature == 'def helper(a, b=1) -> int:'
+    assert symbols['helper'].line == 6  # includes the decorator
+    assert symbols['Widget.render'].signature == 'def render(self, width: int) -> str:'
+    assert symbols['Widget'].end_line == 15
+
+
+def test_regex_symbols_use_brace_ranges():
+    """Brace-delimited definitions span until their braces balance."""
+    symbols = {sym.name: sym for sym in extract_symbols('src/point.rs', RUST_SOURCE)}
+    assert symbols['Point'].kind == 'struct'
+    assert (symbols['Point'].line, symbols['Point'].end_line) == (1, 3)
+    assert (symbols['Point.norm'].line, symbols['Point.norm'].end_line) == (6, 8)
+    assert symbols['Point.norm'].kind == 'method'
+
+
+def test_referenced_names_python():
+    """Imports and references in Python are collected from the AST."""
+    names = referenced_names('a.py', 'from pkg.mod import helper\nhelper(Widget().render(3))\n')
+    assert {'helper', 'Widget', 'render'} <= names
+
+
+def test_signatures_and_lookup(tmp_path):
+    """Signatures for referenced symbols exclude the file's own definitions."""
+    mod = tmp_path / 'mod.py'
+    mod.write_text(PY_SOURCE)
+    user = tmp_path / 'user.py'
+    user.write_text('from mod import helper\n\ndef main():\n    return helper(1)\n')
+    index = SymbolIndex.build([str(mod), str(user)])
+
+    signatures = index.signatures_for(str(user), user.read_text())
+    assert signatures == f'{mod}:6: def helper(a, b=1) -> int:'
+
+    snippet = index.lookup('render')
+    assert 'def render(self,' in snippet and 'return str(width)' in snippet
+    assert index.lookup('missing') is None
+
+
+def test_update_replaces_stale_entries(tmp_path):
+    """Re-indexing a file after an edit refreshes its line ranges."""
+    mod = tmp_path / 'mod.py'
+    mod.write_text('def f():\n    pass\n')
+    index = SymbolIndex.build([str(mod)])
+    mod.write_text('"""Module docs."""\n\n\ndef f():\n    pass\n')
+    index.update(str(mod))
+    assert [sym.line for sym in index.find('f')] == [4]
+
+
+def test_rust_imports_and_qualifiers_rank_first(tmp_path):
+    """Imported and qualified names come before plain identifiers, and common
+    names with many definitions are dropped."""
+    files = []
+    for i in range(5):
+        path = tmp_path / f'm{i}.rs'
+        path.write_text('pub fn new() -> Self {\n}\n')
+        files.append(str(path))
+    geo = tmp_path / 'geo.rs'
+    geo.write_text('pub struct Point {\n}\n\npub fn distance(a: Point) -> f64 {\n}\n\npub fn helper() {\n}\n')
+    user = tmp_path / 'user.rs'
+    user.write_text('use crate::geo::Point;\n\nfn main() {\n    let d = geo::distance(p);\n    helper();\n    new();\n}\n')
+    index = SymbolIndex.build(files + [str(geo), str(user)])
+
+    lines = index.signatures_for(str(user), user.read_text()).splitlines()
+    assert lines == [
+        f'{geo}:1: pub struct Point {{',
+        f'{geo}:4: pub fn distance(a: Point) -> f64 {{',
+        f'{geo}:7: pub fn helper() {{',
+    ]
+
+
+def test_imported_python_names_rank_before_plain_names(tmp_path):
+    """Imports are listed first even when their files sort later."""
+    a = tmp_path / 'a.py'
+    a.write_text('def plain():\n    pass\n')
+    z = tmp_path / 'z.py'
+    z.write_text('def imported():\n    pass\n')
+    user = tmp_path / 'user.py'
+    user.write_text('from z import imported\n\nplain()\nimported()\n')
+    index = SymbolIndex.build([str(a), str(z), str(user)])
+    assert index.signatures_for(str(user), user.read_text(), limit=1).splitlines()[0] == f'{z}:1: def imported():'
+
+
+def test_failed_reindex_drops_stale_entries(tmp_path):
+    """A file that no longer parses is removed from the index."""
+    mod = tmp_path / 'mod.py'
+    mod.write_text('def f():\n    pass\n')
+    index = SymbolIndex.build([str(mod)])
+    mod.write_text('def f(:\n')
+    index.update(str(mod))
+    assert index.find('f') == []
+    assert index.lookup('f') is None
+
+
+def test_qualified_calls_do_not_pull_in_same_named_methods(tmp_path):
+    """'S1::new()' attaches only S1's new, not every other type's new or len."""
+    files = []
+    for i in range(8):
+        path = tmp_path / f's{i}.rs'
+        path.write_text(
+            f'pub struct S{i} {{\n}}\n\nimpl S{i} {{\n    pub fn new() -> Self {{\n    }}\n'
+            '    pub fn len(&self) -> usize {\n    }\n}\n'
+        )
+        files.append(str(path))
+    user = tmp_path / 'user.rs'
+    user.write_text('fn main() {\n    let s = S1::new();\n    let n = v.len();\n}\n')
+    index = SymbolIndex.build(files + [str(user)])
+
+    lines = index.signatures_for(str(user), user.read_text()).splitlines()
+    assert lines == [
+        f'{files[1]}:5: pub fn new() -> Self {{',
+        f'{files[1]}:1: pub struct S1 {{',
+    ]
+
+
+def test_lookup_accepts_qualified_regex_methods(tmp_path):
+    """Methods in impl blocks and Go receivers are found by Type.member and Type::member."""
+    rs = tmp_path / 'point.rs'
+    rs.write_text(RUST_SOURCE)
+    go = tmp_path / 'server.go'
+    go.write_text('type Server struct {\n}\n\nfunc (s *Server) Start() error {\n    return nil\n}\n')
+    index = SymbolIndex.build([str(rs), str(go)])
+    assert 'pub fn norm(&self)' in index.lookup('Point.norm')
+    assert index.lookup('Point::norm') == index.lookup('Point.norm')
+    assert 'func (s *Server) Start()' in index.lookup('Server.Start')
+    assert index.lookup('norm') == index.lookup('Point.norm')